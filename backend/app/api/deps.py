@@ -1,8 +1,12 @@
+import time
+import orjson
+from functools import lru_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.security import verify_token
-from app.core.database import get_db, supabase
-from app.models.user import User, UserRole
+from app.core.database import get_db
+from app.core.cache import AUTH_CACHE_TTL, get_cached_user, cache_user
+from app.models.user import User, UserRole, USER_COLUMNS
 from typing import Optional
 
 security = HTTPBearer()
@@ -22,22 +26,30 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
     
+    cached = await get_cached_user(token)
+    if cached:
+        return User.from_db(orjson.loads(cached))
+    
     # Get user from database
     try:
-        response = db.table('users').select("*").eq('email', email).execute()
-        if not response.data:
+        response = await db.table('users').select(USER_COLUMNS).eq('email', email).maybe_single().execute()
+        if response is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
         
-        user_data = response.data[0]
-        return User(**user_data)
+        user = User.from_db(response.data)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
+    
+    # Cache for the token's remaining lifetime, capped at AUTH_CACHE_TTL
+    ttl = min(int(payload.get("exp", 0) - time.time()), AUTH_CACHE_TTL)
+    await cache_user(token, user.id, orjson.dumps(response.data), ttl)
+    return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user"""
@@ -48,10 +60,17 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
         )
     return current_user
 
+@lru_cache(maxsize=None)
 def require_role(required_role: UserRole):
-    """Dependency to require specific user role"""
+    """Dependency to require specific user role
+    
+    Cached so every call for a role returns the same checker, letting FastAPI
+    resolve it (and the user lookup beneath it) once per request.
+    """
+    allowed_roles = frozenset({required_role, UserRole.ADMINISTRATOR})
+    
     async def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role != required_role and current_user.role != UserRole.ADMINISTRATOR:
+        if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
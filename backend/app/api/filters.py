@@ -0,0 +1,17 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Tuple
+
+def day_bounds(date_from: Optional[date], date_to: Optional[date]) -> Tuple[Optional[str], Optional[str]]:
+    """UTC timestamps for [start of date_from, start of the day after date_to)"""
+    start = datetime.combine(date_from, time.min, timezone.utc).isoformat() if date_from else None
+    end = datetime.combine(date_to + timedelta(days=1), time.min, timezone.utc).isoformat() if date_to else None
+    return start, end
+
+def apply_date_range(query, column: str, date_from: Optional[date], date_to: Optional[date]):
+    """Restrict a timestamp column to the days date_from..date_to, both inclusive"""
+    start, end = day_bounds(date_from, date_to)
+    if start:
+        query = query.gte(column, start)
+    if end:
+        query = query.lt(column, end)
+    return query
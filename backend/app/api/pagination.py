@@ -0,0 +1,31 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Tuple
+from fastapi import HTTPException, status
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value: str, row_id: str) -> str:
+    """Encode the last row's sort key and id as an opaque cursor"""
+    return base64.urlsafe_b64encode(f"{sort_value}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor back into (sort_value, row_id)"""
+    # Both parts end up in a PostgREST filter, so only a timestamp and a uuid get through
+    try:
+        sort_value, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        datetime.fromisoformat(sort_value)
+        row_id = str(uuid.UUID(row_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return sort_value, row_id
+
+def apply_keyset(query, column: str, cursor: str):
+    """Restrict a query ordered by (column DESC, id DESC) to rows after the cursor"""
+    sort_value, row_id = decode_cursor(cursor)
+    return query.or_(f'{column}.lt."{sort_value}",and({column}.eq."{sort_value}",id.lt.{row_id})')
@@ -0,0 +1,19 @@
+import re
+
+# Generated tsvector column (see migrations/008_search_tsvector.sql)
+SEARCH_COLUMN = "search_tsv"
+
+# tsquery operators and PostgREST reserved characters
+_TSQUERY_SPECIAL = re.compile(r"[&|!():*<>'\"\\,]")
+
+def to_prefix_tsquery(term: str) -> str:
+    """Turn free text into a tsquery matching every word as a prefix"""
+    words = _TSQUERY_SPECIAL.sub(" ", term).split()
+    return " & ".join(f"{word}:*" for word in words)
+
+def apply_search(query, term: str):
+    """Filter a query to rows whose search_tsv matches the search term"""
+    tsquery = to_prefix_tsquery(term)
+    if not tsquery:
+        return query
+    return query.filter(SEARCH_COLUMN, "fts(simple)", tsquery)
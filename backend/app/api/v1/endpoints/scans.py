@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
 from datetime import datetime, date
-from app.core.database import get_db
-from app.models.scan import ScanResponse, ScanCreate, ScanUpdate
+from app.core.cache import invalidate_row, cache_row
+from app.core.database import get_db, returning
+from app.models.scan import ScanResponse, ScanCreate, ScanUpdate, SCAN_COLUMNS
 from app.api.deps import get_current_active_user, require_operator
+from app.api.filters import apply_date_range
+from app.api.pagination import NEXT_CURSOR_HEADER, apply_keyset, encode_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ScanResponse])
 async def get_scans(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
     plate_number: Optional[str] = None,
     location: Optional[str] = None,
@@ -21,82 +25,50 @@ async def get_scans(
     db = Depends(get_db)
 ):
     """Get all scans with filtering and pagination"""
-    try:
-        query = db.table('scans').select("*")
-        
-        # Apply filters
-        if plate_number:
-            query = query.ilike('plate_number', f'%{plate_number}%')
-        if location:
-            query = query.ilike('location', f'%{location}%')
-        if camera_id:
-            query = query.eq('camera_id', camera_id)
-        if date_from:
-            query = query.gte('scan_time', date_from.isoformat())
-        if date_to:
-            query = query.lte('scan_time', date_to.isoformat())
-        if search:
-            query = query.or_(f'plate_number.ilike.%{search}%,location.ilike.%{search}%,camera_id.ilike.%{search}%')
-        
-        # Apply pagination and ordering
-        response = query.order('scan_time', desc=True).range(skip, skip + limit - 1).execute()
-        
-        scans = []
-        for scan_data in response.data:
-            scans.append(ScanResponse(
-                id=scan_data['id'],
-                plate_number=scan_data['plate_number'],
-                location=scan_data['location'],
-                scan_time=scan_data['scan_time'],
-                confidence_score=scan_data.get('confidence_score'),
-                image_url=scan_data.get('image_url'),
-                camera_id=scan_data.get('camera_id'),
-                created_at=scan_data['created_at']
-            ))
-        
-        return scans
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch scans"
-        )
+    query = db.table('scans').select(SCAN_COLUMNS)
+    
+    # Apply filters
+    if plate_number:
+        query = query.ilike('plate_number', f'%{plate_number}%')
+    if location:
+        query = query.ilike('location', f'%{location}%')
+    if camera_id:
+        query = query.eq('camera_id', camera_id)
+    query = apply_date_range(query, 'scan_time', date_from, date_to)
+    if search:
+        query = query.or_(f'plate_number.ilike.%{search}%,location.ilike.%{search}%,camera_id.ilike.%{search}%')
+    
+    # Keyset pagination: newest first, continuing after the cursor row
+    if cursor:
+        query = apply_keyset(query, 'scan_time', cursor)
+    result = await query.order('scan_time', desc=True).order('id', desc=True).limit(limit).execute()
+    
+    # Rows already have the ScanResponse shape (SCAN_COLUMNS), so skip
+    # response_model validation and serialize them as-is
+    response = ORJSONResponse(result.data)
+    if len(result.data) == limit:
+        last = result.data[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last['scan_time'], last['id'])
+    
+    return response
 
 @router.get("/{scan_id}", response_model=ScanResponse)
+@cache_row("scans")
 async def get_scan(
     scan_id: str,
     current_user = Depends(get_current_active_user),
     db = Depends(get_db)
 ):
     """Get scan by ID"""
-    try:
-        response = db.table('scans').select("*").eq('id', scan_id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Scan not found"
-            )
-        
-        scan_data = response.data[0]
-        return ScanResponse(
-            id=scan_data['id'],
-            plate_number=scan_data['plate_number'],
-            location=scan_data['location'],
-            scan_time=scan_data['scan_time'],
-            confidence_score=scan_data.get('confidence_score'),
-            image_url=scan_data.get('image_url'),
-            camera_id=scan_data.get('camera_id'),
-            created_at=scan_data['created_at']
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    response = await db.table('scans').select(SCAN_COLUMNS).eq('id', scan_id).maybe_single().execute()
+    
+    if response is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch scan"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan not found"
         )
+    
+    return response.data
 
 @router.post("/", response_model=ScanResponse)
 async def create_scan(
@@ -105,36 +77,17 @@ async def create_scan(
     db = Depends(get_db)
 ):
     """Create new scan record"""
-    try:
-        # Create scan
-        scan_dict = scan_data.dict()
-        response = db.table('scans').insert(scan_dict).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create scan"
-            )
-        
-        created_scan = response.data[0]
-        return ScanResponse(
-            id=created_scan['id'],
-            plate_number=created_scan['plate_number'],
-            location=created_scan['location'],
-            scan_time=created_scan['scan_time'],
-            confidence_score=created_scan.get('confidence_score'),
-            image_url=created_scan.get('image_url'),
-            camera_id=created_scan.get('camera_id'),
-            created_at=created_scan['created_at']
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    # Create scan
+    scan_dict = scan_data.model_dump(mode="json")
+    response = await returning(db.table('scans').insert(scan_dict), SCAN_COLUMNS).execute()
+    
+    if not response.data:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create scan"
         )
+    
+    return ORJSONResponse(response.data[0])
 
 @router.get("/stats/daily")
 async def get_daily_scan_stats(
@@ -144,29 +97,21 @@ async def get_daily_scan_stats(
     db = Depends(get_db)
 ):
     """Get daily scan statistics"""
-    try:
-        query = db.table('scans').select("scan_time", count="exact")
-        
-        if date_from:
-            query = query.gte('scan_time', date_from.isoformat())
-        if date_to:
-            query = query.lte('scan_time', date_to.isoformat())
-        
-        response = query.execute()
-        
-        return {
-            "total_scans": response.count,
-            "date_range": {
-                "from": date_from.isoformat() if date_from else None,
-                "to": date_to.isoformat() if date_to else None
-            }
+    # HEAD request: only the count header comes back, no rows
+    query = db.table('scans').select("id", count="exact", head=True)
+    
+    query = apply_date_range(query, 'scan_time', date_from, date_to)
+    
+    response = await query.execute()
+    
+    # orjson writes the dates itself, no jsonable_encoder pass needed
+    return ORJSONResponse({
+        "total_scans": response.count,
+        "date_range": {
+            "from": date_from,
+            "to": date_to
         }
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch scan statistics"
-        )
+    })
 
 @router.delete("/{scan_id}")
 async def delete_scan(
@@ -175,21 +120,14 @@ async def delete_scan(
     db = Depends(get_db)
 ):
     """Delete scan record"""
-    try:
-        response = db.table('scans').delete().eq('id', scan_id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Scan not found"
-            )
-        
-        return {"message": "Scan deleted successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    response = await returning(db.table('scans').delete().eq('id', scan_id), "id").execute()
+    
+    if not response.data:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete scan"
-        )
\ No newline at end of file
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan not found"
+        )
+    
+    await invalidate_row("scans", scan_id)
+    
+    return {"message": "Scan deleted successfully"}
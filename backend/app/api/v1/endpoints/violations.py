@@ -1,19 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status, Query
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
-from datetime import datetime, date
-from app.core.database import get_db
-from app.models.violation import ViolationResponse, ViolationCreate, ViolationUpdate, ViolationType, ViolationStatus
+from datetime import datetime, date, timedelta, timezone
+from app.core.cache import invalidate_row, cache_row
+from app.core.database import get_db, returning, BULK_INSERT_MAX
+from app.models.violation import ViolationResponse, ViolationCreate, ViolationUpdate, ViolationType, ViolationStatus, VIOLATION_COLUMNS
+from app.api.filters import apply_date_range
+from app.api.pagination import NEXT_CURSOR_HEADER, apply_keyset, encode_cursor
+from app.api.search import apply_search
 from app.api.deps import get_current_active_user, require_operator
 
 router = APIRouter()
 
+# Snapshot of the last RECENT_VIOLATIONS_DAYS days (migrations/011), refreshed every minute
+RECENT_VIOLATIONS_VIEW = 'mv_recent_violations'
+RECENT_VIOLATIONS_DAYS = 30
+
 @router.get("/", response_model=List[ViolationResponse])
 async def get_violations(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
     plate_number: Optional[str] = None,
     violation_type: Optional[ViolationType] = None,
-    status: Optional[ViolationStatus] = None,
+    status_filter: Optional[ViolationStatus] = Query(None, alias="status"),
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     search: Optional[str] = None,
@@ -21,86 +30,51 @@ async def get_violations(
     db = Depends(get_db)
 ):
     """Get all violations with filtering and pagination"""
-    try:
-        query = db.table('violations').select("*")
-        
-        # Apply filters
-        if plate_number:
-            query = query.ilike('plate_number', f'%{plate_number}%')
-        if violation_type:
-            query = query.eq('violation_type', violation_type)
-        if status:
-            query = query.eq('status', status)
-        if date_from:
-            query = query.gte('date_time', date_from.isoformat())
-        if date_to:
-            query = query.lte('date_time', date_to.isoformat())
-        if search:
-            query = query.or_(f'plate_number.ilike.%{search}%,location.ilike.%{search}%,description.ilike.%{search}%')
-        
-        # Apply pagination and ordering
-        response = query.order('date_time', desc=True).range(skip, skip + limit - 1).execute()
-        
-        violations = []
-        for violation_data in response.data:
-            violations.append(ViolationResponse(
-                id=violation_data['id'],
-                plate_number=violation_data['plate_number'],
-                violation_type=violation_data['violation_type'],
-                location=violation_data['location'],
-                date_time=violation_data['date_time'],
-                status=violation_data['status'],
-                description=violation_data.get('description'),
-                fine_amount=violation_data.get('fine_amount'),
-                created_at=violation_data['created_at'],
-                updated_at=violation_data['updated_at']
-            ))
-        
-        return violations
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch violations"
-        )
+    # Windows that start inside the snapshot's range can be served from it
+    recent_start = datetime.now(timezone.utc).date() - timedelta(days=RECENT_VIOLATIONS_DAYS - 1)
+    table = RECENT_VIOLATIONS_VIEW if date_from and date_from >= recent_start else 'violations'
+    query = db.table(table).select(VIOLATION_COLUMNS)
+    
+    # Apply filters
+    if plate_number:
+        query = query.ilike('plate_number', f'%{plate_number}%')
+    if violation_type:
+        query = query.eq('violation_type', violation_type.value)
+    if status_filter:
+        query = query.eq('status', status_filter.value)
+    query = apply_date_range(query, 'date_time', date_from, date_to)
+    if search:
+        query = apply_search(query, search)
+    
+    # Keyset pagination: newest first, continuing after the cursor row
+    if cursor:
+        query = apply_keyset(query, 'date_time', cursor)
+    response = await query.order('date_time', desc=True).order('id', desc=True).limit(limit).execute()
+    
+    result = ORJSONResponse(response.data)
+    if len(response.data) == limit:
+        last = response.data[-1]
+        result.headers[NEXT_CURSOR_HEADER] = encode_cursor(last['date_time'], last['id'])
+    
+    return result
 
 @router.get("/{violation_id}", response_model=ViolationResponse)
+@cache_row("violations")
 async def get_violation(
     violation_id: str,
     current_user = Depends(get_current_active_user),
     db = Depends(get_db)
 ):
     """Get violation by ID"""
-    try:
-        response = db.table('violations').select("*").eq('id', violation_id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Violation not found"
-            )
-        
-        violation_data = response.data[0]
-        return ViolationResponse(
-            id=violation_data['id'],
-            plate_number=violation_data['plate_number'],
-            violation_type=violation_data['violation_type'],
-            location=violation_data['location'],
-            date_time=violation_data['date_time'],
-            status=violation_data['status'],
-            description=violation_data.get('description'),
-            fine_amount=violation_data.get('fine_amount'),
-            created_at=violation_data['created_at'],
-            updated_at=violation_data['updated_at']
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    response = await db.table('violations').select(VIOLATION_COLUMNS).eq('id', violation_id).maybe_single().execute()
+    
+    if response is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch violation"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Violation not found"
         )
+    
+    return response.data
 
 @router.post("/", response_model=ViolationResponse)
 async def create_violation(
@@ -109,38 +83,30 @@ async def create_violation(
     db = Depends(get_db)
 ):
     """Create new violation record"""
-    try:
-        # Create violation
-        violation_dict = violation_data.dict()
-        response = db.table('violations').insert(violation_dict).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create violation"
-            )
-        
-        created_violation = response.data[0]
-        return ViolationResponse(
-            id=created_violation['id'],
-            plate_number=created_violation['plate_number'],
-            violation_type=created_violation['violation_type'],
-            location=created_violation['location'],
-            date_time=created_violation['date_time'],
-            status=created_violation['status'],
-            description=created_violation.get('description'),
-            fine_amount=created_violation.get('fine_amount'),
-            created_at=created_violation['created_at'],
-            updated_at=created_violation['updated_at']
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    # Create violation
+    violation_dict = violation_data.model_dump(mode="json")
+    response = await returning(db.table('violations').insert(violation_dict), VIOLATION_COLUMNS).execute()
+    
+    if not response.data:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create violation"
         )
+    
+    return ORJSONResponse(response.data[0])
+
+@router.post("/bulk", response_model=List[ViolationResponse])
+async def create_violations_bulk(
+    violations: List[ViolationCreate] = Body(..., min_length=1, max_length=BULK_INSERT_MAX),
+    current_user = Depends(require_operator),
+    db = Depends(get_db)
+):
+    """Create many violation records in one insert"""
+    # One multi-row INSERT, so the batch is stored all-or-nothing
+    rows = [violation.model_dump(mode="json") for violation in violations]
+    response = await returning(db.table('violations').insert(rows), VIOLATION_COLUMNS).execute()
+    
+    return ORJSONResponse(response.data)
 
 @router.put("/{violation_id}", response_model=ViolationResponse)
 async def update_violation(
@@ -150,95 +116,52 @@ async def update_violation(
     db = Depends(get_db)
 ):
     """Update violation record"""
-    try:
-        # Check if violation exists
-        response = db.table('violations').select("*").eq('id', violation_id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Violation not found"
-            )
-        
-        # Prepare update data
-        update_data = {k: v for k, v in violation_update.dict().items() if v is not None}
-        
-        if not update_data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No fields to update"
-            )
-        
-        # Update violation
-        response = db.table('violations').update(update_data).eq('id', violation_id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update violation"
-            )
-        
-        updated_violation = response.data[0]
-        return ViolationResponse(
-            id=updated_violation['id'],
-            plate_number=updated_violation['plate_number'],
-            violation_type=updated_violation['violation_type'],
-            location=updated_violation['location'],
-            date_time=updated_violation['date_time'],
-            status=updated_violation['status'],
-            description=updated_violation.get('description'),
-            fine_amount=updated_violation.get('fine_amount'),
-            created_at=updated_violation['created_at'],
-            updated_at=updated_violation['updated_at']
+    # Prepare update data
+    update_data = violation_update.model_dump(mode="json", exclude_unset=True, exclude_none=True)
+    
+    if not update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    
+    # Update violation; no row back means it doesn't exist
+    response = await returning(db.table('violations').update(update_data).eq('id', violation_id), VIOLATION_COLUMNS).execute()
+    
+    if not response.data:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update violation"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Violation not found"
         )
+    
+    await invalidate_row("violations", violation_id)
+    
+    return ORJSONResponse(response.data[0])
 
-@router.post("/{violation_id}/resolve", response_model=ViolationResponse)
+@router.post("/{violation_id}/resolve", response_model=ViolationResponse, responses={204: {"description": "Violation resolved"}})
 async def resolve_violation(
     violation_id: str,
+    return_: Optional[str] = Query(None, alias="return", pattern="^full$"),
     current_user = Depends(require_operator),
     db = Depends(get_db)
 ):
-    """Mark violation as resolved"""
-    try:
-        response = db.table('violations').update({
-            'status': 'resolved'
-        }).eq('id', violation_id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Violation not found"
-            )
-        
-        resolved_violation = response.data[0]
-        return ViolationResponse(
-            id=resolved_violation['id'],
-            plate_number=resolved_violation['plate_number'],
-            violation_type=resolved_violation['violation_type'],
-            location=resolved_violation['location'],
-            date_time=resolved_violation['date_time'],
-            status=resolved_violation['status'],
-            description=resolved_violation.get('description'),
-            fine_amount=resolved_violation.get('fine_amount'),
-            created_at=resolved_violation['created_at'],
-            updated_at=resolved_violation['updated_at']
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    """Mark violation as resolved (204, or the violation with ?return=full)"""
+    response = await returning(db.table('violations').update({
+        'status': 'resolved'
+    }).eq('id', violation_id), VIOLATION_COLUMNS if return_ else "id").execute()
+    
+    if not response.data:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to resolve violation"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Violation not found"
         )
+    
+    await invalidate_row("violations", violation_id)
+    
+    if not return_:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    
+    return ORJSONResponse(response.data[0])
 
 @router.delete("/{violation_id}")
 async def delete_violation(
@@ -247,21 +170,14 @@ async def delete_violation(
     db = Depends(get_db)
 ):
     """Delete violation record"""
-    try:
-        response = db.table('violations').delete().eq('id', violation_id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Violation not found"
-            )
-        
-        return {"message": "Violation deleted successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    response = await returning(db.table('violations').delete().eq('id', violation_id), "id").execute()
+    
+    if not response.data:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete violation"
-        )
\ No newline at end of file
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Violation not found"
+        )
+    
+    await invalidate_row("violations", violation_id)
+    
+    return {"message": "Violation deleted successfully"}
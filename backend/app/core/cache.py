@@ -0,0 +1,142 @@
+import hashlib
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+from cachetools import TTLCache
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from starlette.requests import Request
+from starlette.responses import Response
+from app.core.config import settings
+from app.models.user import UserRole
+
+# Redis client shared by response caching and the auth user cache
+redis = aioredis.from_url(settings.REDIS_URL)
+
+# Prefix for response cache keys: <prefix>:<namespace>:<hash or row id:role>
+CACHE_PREFIX = "vpr"
+
+# Upper bound for how long an authenticated user stays cached
+AUTH_CACHE_TTL = 300
+
+# Per-process copy of hot auth entries; other workers only see invalidations
+# through Redis, so keep this short-lived
+LOCAL_AUTH_TTL = 30
+_local_auth = TTLCache(maxsize=10000, ttl=LOCAL_AUTH_TTL)
+
+# Response fastapi-cache injects into the routes it wraps
+_CACHE_RESPONSE_KWARG = "__fastapi_cache_response"
+
+# Dependency kwargs that must not take part in cache keys
+_UNCACHED_KWARGS = {"db", "current_user"}
+
+def init_cache():
+    """Initialize Redis-backed response caching"""
+    FastAPICache.init(RedisBackend(redis), prefix=CACHE_PREFIX)
+
+def shared_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Tuple[Any, ...] = (),
+    kwargs: Dict[str, Any] = {},
+) -> str:
+    """Build a cache key from the route and its query params only, shared by all users"""
+    params = {k: v for k, v in kwargs.items() if k not in _UNCACHED_KWARGS}
+    cache_key = hashlib.md5(f"{func.__module__}:{func.__name__}:{params}".encode()).hexdigest()
+    return f"{namespace}:{cache_key}"
+
+def row_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Tuple[Any, ...] = (),
+    kwargs: Dict[str, Any] = {},
+) -> str:
+    """Build <namespace>:<row id>:<role> for a by-id route, whose only param is the id"""
+    row_id = next(v for k, v in kwargs.items() if k not in _UNCACHED_KWARGS)
+    role = getattr(kwargs.get("current_user"), "role", None)
+    return f"{namespace}:{row_id}:{getattr(role, 'value', role)}"
+
+def cache_row(namespace: str):
+    """Cache a by-id read per row and role, without letting clients cache it
+
+    fastapi-cache marks responses max-age=<ttl> with a per-process ETag;
+    rows are invalidated server-side on writes, so clients must revalidate.
+    """
+    def decorator(func):
+        cached = cache(expire=settings.READ_CACHE_TTL, namespace=namespace, key_builder=row_key_builder)(func)
+        
+        @wraps(cached)
+        async def inner(*args, **kwargs):
+            result = await cached(*args, **kwargs)
+            response = kwargs.get(_CACHE_RESPONSE_KWARG)
+            if response is not None:
+                response.headers["Cache-Control"] = "private, no-cache"
+                if "etag" in response.headers:
+                    del response.headers["etag"]
+            return result
+        return inner
+    return decorator
+
+async def invalidate_row(namespace: str, row_id: str):
+    """Drop the cached by-id reads of one row, for every role (e.g. after a write to it)"""
+    keys = [f"{CACHE_PREFIX}:{namespace}:{row_id}:{role.value}" for role in UserRole]
+    try:
+        await redis.unlink(*keys)
+    except RedisError:
+        pass
+
+
+def _auth_key(token: str) -> str:
+    return f"auth:{hashlib.sha256(token.encode()).hexdigest()}"
+
+def _auth_user_key(user_id: str) -> str:
+    return f"auth:user:{user_id}"
+
+async def get_cached_user(token: str) -> Optional[bytes]:
+    """Get the serialized user cached for a token, if any"""
+    key = _auth_key(token)
+    data = _local_auth.get(key)
+    if data is not None:
+        return data
+    try:
+        data = await redis.get(key)
+    except RedisError:
+        return None
+    if data is not None:
+        _local_auth[key] = data
+    return data
+
+async def cache_user(token: str, user_id: str, data: bytes, ttl: int):
+    """Cache the serialized user for a token and index it by user id"""
+    if ttl <= 0:
+        return
+    key = _auth_key(token)
+    user_key = _auth_user_key(user_id)
+    _local_auth[key] = data
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, data)
+            pipe.sadd(user_key, key)
+            pipe.expire(user_key, AUTH_CACHE_TTL)
+            await pipe.execute()
+    except RedisError:
+        pass
+
+async def invalidate_user_cache(user_id: str):
+    """Drop every cached token entry for a user (e.g. after a role or status change)"""
+    user_key = _auth_user_key(user_id)
+    try:
+        keys = await redis.smembers(user_key)
+        for key in keys:
+            _local_auth.pop(key.decode(), None)
+        await redis.delete(user_key, *keys)
+    except RedisError:
+        pass
@@ -1,28 +1,38 @@
-from pydantic_settings import BaseSettings
-from typing import List
+from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 
 class Settings(BaseSettings):
+    # Read from the environment, falling back to .env
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    
     # Database
-    SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
-    SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
-    SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    SUPABASE_URL: str = ""
+    SUPABASE_KEY: str = ""
+    SUPABASE_SERVICE_KEY: str = ""
+    DATABASE_URL: str = ""
+    DB_POOL_SIZE: int = 20
+    DB_POOL_IDLE_TIMEOUT: int = 300
+    
+    # Cache
+    REDIS_URL: str = "redis://localhost:6379/0"
+    ANALYTICS_CACHE_TTL: int = 30
+    READ_CACHE_TTL: int = 60
     
     # JWT
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
-    ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    SECRET_KEY: str = "your-secret-key-change-in-production"
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     # Application
-    DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
-    HOST: str = os.getenv("HOST", "0.0.0.0")
-    PORT: int = int(os.getenv("PORT", "8000"))
+    DEBUG: bool = True
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = os.cpu_count() or 1
     
-    # CORS
-    ALLOWED_ORIGINS: List[str] = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
+    # Trusted hosts, comma-separated ("*" accepts any Host header)
+    ALLOWED_HOSTS: str = "*"
     
-    class Config:
-        env_file = ".env"
+    # CORS origins, comma-separated
+    ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,22 +1,65 @@
-from supabase import create_client, Client
+import logging
+import httpx
+from fastapi import FastAPI, Request
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_TIMEOUT
+from supabase import AsyncClient, AsyncClientOptions, create_async_client
 from app.core.config import settings
-import asyncio
 
-# Supabase client
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-supabase_admin: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+logger = logging.getLogger(__name__)
 
-async def init_db():
+# Postgres SQLSTATE raised when a UNIQUE constraint is violated
+UNIQUE_VIOLATION = "23505"
+
+# Most records accepted by one bulk insert request
+BULK_INSERT_MAX = 1000
+
+def returning(query, columns: str):
+    """Limit the rows an insert/update/delete sends back to these columns"""
+    query.params = query.params.add("select", columns)
+    return query
+
+# postgrest rewrites base_url and headers on the client it is given,
+# so each Supabase client gets its own pool
+def _http_pool() -> httpx.AsyncClient:
+    """Keep-alive connection pool for one Supabase client"""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=settings.DB_POOL_SIZE,
+            max_keepalive_connections=settings.DB_POOL_SIZE,
+            keepalive_expiry=settings.DB_POOL_IDLE_TIMEOUT
+        ),
+        timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+        follow_redirects=True
+    )
+
+async def connect_db(app: FastAPI):
+    """Create the Supabase clients once and keep them on app.state"""
+    app.state.supabase = await create_async_client(
+        settings.SUPABASE_URL, settings.SUPABASE_KEY,
+        options=AsyncClientOptions(httpx_client=_http_pool())
+    )
+    app.state.supabase_admin = await create_async_client(
+        settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY,
+        options=AsyncClientOptions(httpx_client=_http_pool())
+    )
+
+async def close_db(app: FastAPI):
+    """Close the HTTP connections held by the Supabase clients"""
+    await app.state.supabase.postgrest.aclose()
+    await app.state.supabase_admin.postgrest.aclose()
+
+async def init_db(db: AsyncClient):
     """Initialize database connection and run any setup"""
     try:
-        # Test connection
-        response = supabase.table('users').select("count", count="exact").execute()
-        print(f"✅ Database connected successfully")
+        # Test connection with a single-row read (no count, so no table scan)
+        await db.table('users').select('id').limit(1).execute()
+        logger.info("✅ Database connected successfully")
         return True
     except Exception as e:
-        print(f"❌ Database connection failed: {e}")
+        logger.error("❌ Database connection failed: %s", e)
         return False
 
-async def get_db():
+async def get_db(request: Request) -> AsyncClient:
     """Dependency to get database client"""
-    return supabase
\ No newline at end of file
+    return request.app.state.supabase
@@ -1,24 +1,89 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Response, status
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 from contextlib import asynccontextmanager
-import os
-from dotenv import load_dotenv
+import logging
+import orjson
 
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.database import init_db
+from app.core.database import connect_db, close_db, init_db
+from app.core.cache import init_cache
 
-load_dotenv()
+# App loggers report startup at INFO only in DEBUG; everything else stays at WARNING
+logging.basicConfig(format="%(levelname)s: %(name)s - %(message)s")
+logging.getLogger("app").setLevel(logging.INFO if settings.DEBUG else logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Static bodies for the root and health endpoints, encoded once at import
+_ROOT_BODY = orjson.dumps({
+    "message": "VPR System API",
+    "version": "1.0.0",
+    "status": "running",
+    "docs": "/docs"
+})
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "vpr-backend"})
+
+class HealthCheckMiddleware:
+    """Answer GET /health before CORS, host checks and routing run"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.response = Response(_HEALTH_BODY, media_type="application/json")
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"] == "/health" and scope["method"] == "GET":
+            await self.response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+class UnhandledErrorMiddleware:
+    """Turn errors endpoints don't raise as HTTPException into a 500 inside CORS"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            logger.exception("Unhandled error on %s %s", scope["method"], scope["path"])
+            # Too late for a 500 once a (streaming) response is under way
+            if response_started:
+                raise
+            response = ORJSONResponse(
+                {"detail": "Internal server error"},
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+            await response(scope, receive, send)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("🚀 Starting VPR System Backend...")
-    await init_db()
+    logger.info("🚀 Starting VPR System Backend...")
+    await connect_db(app)
+    await init_db(app.state.supabase)
+    init_cache()
+    # Models are compiled at import; the OpenAPI schema is the one lazy build left
+    app.openapi()
     yield
     # Shutdown
-    print("🛑 Shutting down VPR System Backend...")
+    logger.info("🛑 Shutting down VPR System Backend...")
+    await close_db(app)
 
 app = FastAPI(
     title="VPR System API",
@@ -26,45 +91,36 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Added before CORS so the 500s it sends still get CORS headers
+app.add_middleware(UnhandledErrorMiddleware)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
+    allow_origins=[origin.strip() for origin in settings.ALLOWED_ORIGINS.split(",")],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Trusted Host Middleware
-app.add_middleware(
-    TrustedHostMiddleware,
-    allowed_hosts=["*"]  # Configure appropriately for production
-)
+# Trusted Host Middleware (skipped entirely when every host is allowed)
+allowed_hosts = [host.strip() for host in settings.ALLOWED_HOSTS.split(",")]
+if allowed_hosts != ["*"]:
+    app.add_middleware(
+        TrustedHostMiddleware,
+        allowed_hosts=allowed_hosts
+    )
+
+# Added last so it wraps the middleware above: probes skip all of it
+app.add_middleware(HealthCheckMiddleware)
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
-    return {
-        "message": "VPR System API",
-        "version": "1.0.0",
-        "status": "running",
-        "docs": "/docs"
-    }
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "vpr-backend"}
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.DEBUG
-    )
\ No newline at end of file
+    return Response(_ROOT_BODY, media_type="application/json")
@@ -0,0 +1,13 @@
+import re
+from typing import Annotated
+from pydantic import AfterValidator
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def _check_email(value: str) -> str:
+    if not _EMAIL_RE.match(value):
+        raise ValueError("value is not a valid email address")
+    return value
+
+# Shape check only (local@domain.tld); the database holds the real constraints
+Email = Annotated[str, AfterValidator(_check_email)]
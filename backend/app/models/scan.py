@@ -1,12 +1,14 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Optional, TypeAlias
 from datetime import datetime
 
+ConfidenceScore = Annotated[float, Field(strict=True, ge=0, le=1)]
+
 class ScanBase(BaseModel):
     plate_number: str
     location: str
     scan_time: datetime
-    confidence_score: Optional[float] = None
+    confidence_score: Optional[ConfidenceScore] = None
     image_url: Optional[str] = None
     camera_id: Optional[str] = None
 
@@ -14,10 +16,12 @@ class ScanCreate(ScanBase):
     pass
 
 class ScanUpdate(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     plate_number: Optional[str] = None
     location: Optional[str] = None
     scan_time: Optional[datetime] = None
-    confidence_score: Optional[float] = None
+    confidence_score: Optional[ConfidenceScore] = None
     image_url: Optional[str] = None
     camera_id: Optional[str] = None
 
@@ -25,10 +29,11 @@ class ScanInDB(ScanBase):
     id: str
     created_at: datetime
 
-class Scan(ScanInDB):
-    pass
+Scan: TypeAlias = ScanInDB
 
 class ScanResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+    
     id: str
     plate_number: str
     location: str
@@ -36,4 +41,7 @@ class ScanResponse(BaseModel):
     confidence_score: Optional[float] = None
     image_url: Optional[str] = None
     camera_id: Optional[str] = None
-    created_at: str
\ No newline at end of file
+    created_at: str
+
+# Columns read from the scans table for ScanResponse
+SCAN_COLUMNS = "id,plate_number,location,scan_time,confidence_score,image_url,camera_id,created_at"
\ No newline at end of file
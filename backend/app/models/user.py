@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, TypeAlias
 from datetime import datetime
 from enum import Enum
+from app.models.fields import Email
 
 class UserRole(str, Enum):
     ADMINISTRATOR = "Administrator"
@@ -15,15 +16,17 @@ class UserStatus(str, Enum):
 
 class UserBase(BaseModel):
     name: str
-    email: EmailStr
+    email: Email
     role: UserRole = UserRole.VIEWER
 
 class UserCreate(UserBase):
     password: str
 
 class UserUpdate(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     name: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
     role: Optional[UserRole] = None
     status: Optional[UserStatus] = None
 
@@ -34,10 +37,16 @@ class UserInDB(UserBase):
     created_at: datetime
     updated_at: datetime
 
-class User(UserInDB):
-    pass
+    @classmethod
+    def from_db(cls, row: dict):
+        """Build from a users row as stored, skipping validation"""
+        return cls.model_construct(**row)
+
+User: TypeAlias = UserInDB
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra='ignore')
+    
     id: str
     name: str
     email: str
@@ -47,9 +56,14 @@ class UserResponse(BaseModel):
     created_at: str
     updated_at: str
 
+# Columns read from the users table for UserResponse (never password_hash)
+USER_COLUMNS = "id,name,email,role,status,last_login,created_at,updated_at"
+
 class Token(BaseModel):
     access_token: str
     token_type: str
 
 class TokenData(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     email: Optional[str] = None
\ No newline at end of file
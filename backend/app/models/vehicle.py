@@ -1,7 +1,10 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Optional, TypeAlias
 from datetime import datetime, date
 from enum import Enum
+from app.models.fields import Email
+
+Year = Annotated[int, Field(strict=True, ge=1900, le=2100)]
 
 class VehicleStatus(str, Enum):
     ACTIVE = "active"
@@ -21,14 +24,14 @@ class VehicleBase(BaseModel):
     plate_number: str
     make: str
     model: str
-    year: int
+    year: Year
     color: str
     vehicle_type: VehicleType
     engine_number: str
     chassis_number: str
     owner_name: str
     owner_phone: str
-    owner_email: EmailStr
+    owner_email: Email
     owner_address: str
     registration_date: date
     expiry_date: date
@@ -38,17 +41,19 @@ class VehicleCreate(VehicleBase):
     pass
 
 class VehicleUpdate(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     plate_number: Optional[str] = None
     make: Optional[str] = None
     model: Optional[str] = None
-    year: Optional[int] = None
+    year: Optional[Year] = None
     color: Optional[str] = None
     vehicle_type: Optional[VehicleType] = None
     engine_number: Optional[str] = None
     chassis_number: Optional[str] = None
     owner_name: Optional[str] = None
     owner_phone: Optional[str] = None
-    owner_email: Optional[EmailStr] = None
+    owner_email: Optional[Email] = None
     owner_address: Optional[str] = None
     registration_date: Optional[date] = None
     expiry_date: Optional[date] = None
@@ -59,10 +64,11 @@ class VehicleInDB(VehicleBase):
     created_at: datetime
     updated_at: datetime
 
-class Vehicle(VehicleInDB):
-    pass
+Vehicle: TypeAlias = VehicleInDB
 
 class VehicleResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+    
     id: str
     plate_number: str
     make: str
@@ -80,4 +86,11 @@ class VehicleResponse(BaseModel):
     expiry_date: str
     status: str
     created_at: str
-    updated_at: str
\ No newline at end of file
+    updated_at: str
+
+# Columns read from the vehicles table for VehicleResponse
+VEHICLE_COLUMNS = (
+    "id,plate_number,make,model,year,color,vehicle_type,engine_number,chassis_number,"
+    "owner_name,owner_phone,owner_email,owner_address,registration_date,expiry_date,"
+    "status,created_at,updated_at"
+)
\ No newline at end of file
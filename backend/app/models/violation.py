@@ -1,8 +1,10 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Optional, TypeAlias
 from datetime import datetime
 from enum import Enum
 
+FineAmount = Annotated[float, Field(strict=True, ge=0)]
+
 class ViolationType(str, Enum):
     SPEEDING = "speeding"
     PARKING = "parking"
@@ -22,29 +24,32 @@ class ViolationBase(BaseModel):
     date_time: datetime
     status: ViolationStatus = ViolationStatus.OPEN
     description: Optional[str] = None
-    fine_amount: Optional[float] = None
+    fine_amount: Optional[FineAmount] = None
 
 class ViolationCreate(ViolationBase):
     pass
 
 class ViolationUpdate(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     plate_number: Optional[str] = None
     violation_type: Optional[ViolationType] = None
     location: Optional[str] = None
     date_time: Optional[datetime] = None
     status: Optional[ViolationStatus] = None
     description: Optional[str] = None
-    fine_amount: Optional[float] = None
+    fine_amount: Optional[FineAmount] = None
 
 class ViolationInDB(ViolationBase):
     id: str
     created_at: datetime
     updated_at: datetime
 
-class Violation(ViolationInDB):
-    pass
+Violation: TypeAlias = ViolationInDB
 
 class ViolationResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+    
     id: str
     plate_number: str
     violation_type: str
@@ -54,4 +59,7 @@ class ViolationResponse(BaseModel):
     description: Optional[str] = None
     fine_amount: Optional[float] = None
     created_at: str
-    updated_at: str
\ No newline at end of file
+    updated_at: str
+
+# Columns read from the violations table for ViolationResponse
+VIOLATION_COLUMNS = "id,plate_number,violation_type,location,date_time,status,description,fine_amount,created_at,updated_at"
\ No newline at end of file
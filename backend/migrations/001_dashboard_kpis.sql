@@ -0,0 +1,18 @@
+-- Dashboard KPIs in a single round-trip.
+-- Called from GET /api/v1/analytics/dashboard via db.rpc('dashboard_kpis').
+
+CREATE OR REPLACE FUNCTION dashboard_kpis()
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'total_scans',       (SELECT count(*) FROM scans),
+        'total_violations',  (SELECT count(*) FROM violations),
+        'active_violations', (SELECT count(*) FROM violations WHERE status <> 'resolved'),
+        'total_vehicles',    (SELECT count(*) FROM vehicles),
+        'active_users',      (SELECT count(*) FROM users WHERE status = 'active'),
+        'pending_approvals', (SELECT count(*) FROM users WHERE status = 'pending'),
+        'recent_scans',      (SELECT count(*) FROM scans WHERE scan_time >= now() - interval '30 days')
+    );
+$$;
@@ -0,0 +1,71 @@
+-- Grouped counts for the analytics endpoints, so only one row per group
+-- leaves the database instead of every matching record.
+
+CREATE OR REPLACE FUNCTION violation_trends(p_from timestamptz, p_to timestamptz)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+    WITH v AS (
+        SELECT violation_type, status
+        FROM violations
+        WHERE date_time >= p_from AND date_time <= p_to
+    )
+    SELECT json_build_object(
+        'total_violations', (SELECT count(*) FROM v),
+        'by_type', coalesce(
+            (SELECT json_object_agg(violation_type, c)
+             FROM (SELECT violation_type, count(*) AS c FROM v GROUP BY violation_type) t),
+            '{}'::json),
+        'by_status', coalesce(
+            (SELECT json_object_agg(status, c)
+             FROM (SELECT status, count(*) AS c FROM v GROUP BY status) t),
+            '{}'::json)
+    );
+$$;
+
+CREATE OR REPLACE FUNCTION scan_activity(p_from timestamptz, p_to timestamptz)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+    WITH s AS (
+        SELECT location, coalesce(camera_id, 'unknown') AS camera_id
+        FROM scans
+        WHERE scan_time >= p_from AND scan_time <= p_to
+    )
+    SELECT json_build_object(
+        'total_scans', (SELECT count(*) FROM s),
+        'by_location', coalesce(
+            (SELECT json_object_agg(location, c)
+             FROM (SELECT location, count(*) AS c FROM s GROUP BY location) t),
+            '{}'::json),
+        'by_camera', coalesce(
+            (SELECT json_object_agg(camera_id, c)
+             FROM (SELECT camera_id, count(*) AS c FROM s GROUP BY camera_id) t),
+            '{}'::json)
+    );
+$$;
+
+CREATE OR REPLACE FUNCTION vehicle_statistics(p_expiry_threshold date)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'total_vehicles', (SELECT count(*) FROM vehicles),
+        'by_make', coalesce(
+            (SELECT json_object_agg(make, c)
+             FROM (SELECT make, count(*) AS c FROM vehicles GROUP BY make) t),
+            '{}'::json),
+        'by_type', coalesce(
+            (SELECT json_object_agg(vehicle_type, c)
+             FROM (SELECT vehicle_type, count(*) AS c FROM vehicles GROUP BY vehicle_type) t),
+            '{}'::json),
+        'by_status', coalesce(
+            (SELECT json_object_agg(status, c)
+             FROM (SELECT status, count(*) AS c FROM vehicles GROUP BY status) t),
+            '{}'::json),
+        'expiring_soon', (SELECT count(*) FROM vehicles WHERE expiry_date <= p_expiry_threshold)
+    );
+$$;
@@ -0,0 +1,21 @@
+-- Indexes for the filter and sort patterns used by the list endpoints.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- GET /scans: default ORDER BY scan_time DESC and date range filters
+CREATE INDEX IF NOT EXISTS scans_scan_time_desc_idx ON scans (scan_time DESC);
+
+-- GET /scans?camera_id=...: equality on camera_id, newest first
+CREATE INDEX IF NOT EXISTS scans_camera_id_scan_time_idx ON scans (camera_id, scan_time DESC);
+
+-- GET /scans?plate_number=...&location=...: ILIKE '%term%' substring filters
+CREATE INDEX IF NOT EXISTS scans_plate_trgm_idx ON scans USING gin (plate_number gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS scans_location_trgm_idx ON scans USING gin (location gin_trgm_ops);
+
+-- GET /violations: ORDER BY date_time DESC, date range and status filters
+CREATE INDEX IF NOT EXISTS violations_date_time_idx ON violations (date_time DESC);
+CREATE INDEX IF NOT EXISTS violations_status_idx ON violations (status);
+
+-- users.email is already indexed by its UNIQUE constraint; status drives
+-- the dashboard user counts and the pending approvals list
+CREATE INDEX IF NOT EXISTS users_status_idx ON users (status);
@@ -0,0 +1,6 @@
+-- GET /scans pages by (scan_time DESC, id DESC). The composite index serves
+-- both the ordering and the cursor predicate, and replaces the single-column
+-- scan_time index for range filters.
+
+CREATE INDEX IF NOT EXISTS scans_scan_time_id_desc_idx ON scans (scan_time DESC, id DESC);
+DROP INDEX IF EXISTS scans_scan_time_desc_idx;
@@ -0,0 +1,5 @@
+-- Registration relies on the database to reject duplicate emails (SQLSTATE
+-- 23505) instead of checking first. Make that check case-insensitive so
+-- "User@x.com" and "user@x.com" cannot both register.
+
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_lower_idx ON users (lower(email));
@@ -0,0 +1,79 @@
+-- Daily rollups for the trends and activity endpoints.
+-- violation_trends() and scan_activity() sum pre-grouped per-day rows
+-- instead of aggregating every violation/scan in the window on each call.
+-- The views roll up all history, and each refresh rescans the full
+-- violations/scans tables; pg_cron refreshes them every 5 minutes, so
+-- results can lag by up to that long.
+-- The window is half-open (d < p_to): the endpoints pass today's date as
+-- p_to, so today's partial bucket is left out and days=N covers N full days,
+-- as in 002.
+
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_violation_daily AS
+    SELECT date_trunc('day', date_time) AS d, violation_type, status, count(*) AS c
+    FROM violations
+    GROUP BY 1, 2, 3;
+
+-- REFRESH ... CONCURRENTLY requires a unique index
+CREATE UNIQUE INDEX IF NOT EXISTS mv_violation_daily_key
+    ON mv_violation_daily (d, violation_type, status);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_scan_daily AS
+    SELECT date_trunc('day', scan_time) AS d, location, coalesce(camera_id, 'unknown') AS camera_id, count(*) AS c
+    FROM scans
+    GROUP BY 1, 2, 3;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_scan_daily_key
+    ON mv_scan_daily (d, location, camera_id);
+
+SELECT cron.schedule('refresh_mv_violation_daily', '*/5 * * * *',
+    'REFRESH MATERIALIZED VIEW CONCURRENTLY mv_violation_daily');
+SELECT cron.schedule('refresh_mv_scan_daily', '*/5 * * * *',
+    'REFRESH MATERIALIZED VIEW CONCURRENTLY mv_scan_daily');
+
+CREATE OR REPLACE FUNCTION violation_trends(p_from timestamptz, p_to timestamptz)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+    WITH v AS (
+        SELECT violation_type, status, c
+        FROM mv_violation_daily
+        WHERE d >= date_trunc('day', p_from) AND d < p_to
+    )
+    SELECT json_build_object(
+        'total_violations', (SELECT coalesce(sum(c), 0) FROM v),
+        'by_type', coalesce(
+            (SELECT json_object_agg(violation_type, c)
+             FROM (SELECT violation_type, sum(c) AS c FROM v GROUP BY violation_type) t),
+            '{}'::json),
+        'by_status', coalesce(
+            (SELECT json_object_agg(status, c)
+             FROM (SELECT status, sum(c) AS c FROM v GROUP BY status) t),
+            '{}'::json)
+    );
+$$;
+
+CREATE OR REPLACE FUNCTION scan_activity(p_from timestamptz, p_to timestamptz)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+    WITH s AS (
+        SELECT location, camera_id, c
+        FROM mv_scan_daily
+        WHERE d >= date_trunc('day', p_from) AND d < p_to
+    )
+    SELECT json_build_object(
+        'total_scans', (SELECT coalesce(sum(c), 0) FROM s),
+        'by_location', coalesce(
+            (SELECT json_object_agg(location, c)
+             FROM (SELECT location, sum(c) AS c FROM s GROUP BY location) t),
+            '{}'::json),
+        'by_camera', coalesce(
+            (SELECT json_object_agg(camera_id, c)
+             FROM (SELECT camera_id, sum(c) AS c FROM s GROUP BY camera_id) t),
+            '{}'::json)
+    );
+$$;
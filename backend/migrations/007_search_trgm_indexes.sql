@@ -0,0 +1,21 @@
+-- Trigram indexes for the ILIKE '%term%' filters and `search` parameters of
+-- the list endpoints. B-tree indexes cannot serve a leading wildcard, so
+-- without these every search is a sequential scan. Requires pg_trgm (003).
+
+-- GET /users?search=...
+CREATE INDEX IF NOT EXISTS users_name_trgm_idx ON users USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS users_email_trgm_idx ON users USING gin (email gin_trgm_ops);
+
+-- GET /vehicles?plate_number=...&search=...
+CREATE INDEX IF NOT EXISTS vehicles_plate_trgm_idx ON vehicles USING gin (plate_number gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS vehicles_make_trgm_idx ON vehicles USING gin (make gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS vehicles_model_trgm_idx ON vehicles USING gin (model gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS vehicles_owner_name_trgm_idx ON vehicles USING gin (owner_name gin_trgm_ops);
+
+-- GET /violations?plate_number=...&search=...
+CREATE INDEX IF NOT EXISTS violations_plate_trgm_idx ON violations USING gin (plate_number gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS violations_location_trgm_idx ON violations USING gin (location gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS violations_description_trgm_idx ON violations USING gin (description gin_trgm_ops);
+
+-- GET /scans?search=... also matches camera_id (plate_number and location are in 003)
+CREATE INDEX IF NOT EXISTS scans_camera_id_trgm_idx ON scans USING gin (camera_id gin_trgm_ops);
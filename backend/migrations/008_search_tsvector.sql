@@ -0,0 +1,26 @@
+-- Full-text search for the `search` parameter of the users, vehicles and
+-- violations lists. One GIN lookup on a generated tsvector replaces the
+-- OR'd ILIKE scans over each column. The 'simple' config keeps plates,
+-- names and emails as-is (no stemming or stop words).
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(email, ''))
+    ) STORED;
+CREATE INDEX IF NOT EXISTS users_search_tsv_idx ON users USING gin (search_tsv);
+
+ALTER TABLE vehicles ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('simple',
+            coalesce(plate_number, '') || ' ' || coalesce(make, '') || ' ' ||
+            coalesce(model, '') || ' ' || coalesce(owner_name, ''))
+    ) STORED;
+CREATE INDEX IF NOT EXISTS vehicles_search_tsv_idx ON vehicles USING gin (search_tsv);
+
+ALTER TABLE violations ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('simple',
+            coalesce(plate_number, '') || ' ' || coalesce(location, '') || ' ' ||
+            coalesce(description, ''))
+    ) STORED;
+CREATE INDEX IF NOT EXISTS violations_search_tsv_idx ON violations USING gin (search_tsv);
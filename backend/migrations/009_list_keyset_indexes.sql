@@ -0,0 +1,9 @@
+-- GET /violations, /users and /vehicles page by (sort column DESC, id DESC)
+-- like /scans (004). Each composite index serves the ordering and the cursor
+-- predicate at any depth.
+
+CREATE INDEX IF NOT EXISTS violations_date_time_id_desc_idx ON violations (date_time DESC, id DESC);
+DROP INDEX IF EXISTS violations_date_time_idx;
+
+CREATE INDEX IF NOT EXISTS users_created_at_id_desc_idx ON users (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS vehicles_created_at_id_desc_idx ON vehicles (created_at DESC, id DESC);
@@ -0,0 +1,7 @@
+-- GET /users/pending reads the few users awaiting approval. The partial
+-- index holds only those rows and covers every column the endpoint selects,
+-- so the list is an index-only scan however large users grows.
+
+CREATE INDEX IF NOT EXISTS users_pending_created_at_idx ON users (created_at DESC)
+    INCLUDE (id, name, email, role, status, last_login, updated_at)
+    WHERE status = 'pending';
@@ -0,0 +1,23 @@
+-- GET /violations for windows inside the last 30 days (the dashboard's
+-- "last 24h, pending" and similar) reads this snapshot instead of the full
+-- table. Refreshed every minute by pg_cron, so new or edited violations can
+-- take up to that long to show up in those lists.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_recent_violations AS
+    SELECT * FROM violations
+    WHERE date_time > now() - interval '30 days';
+
+-- REFRESH ... CONCURRENTLY requires a unique index
+CREATE UNIQUE INDEX IF NOT EXISTS mv_recent_violations_id_key ON mv_recent_violations (id);
+
+-- Same ordering/cursor and search paths as the table (008, 009)
+CREATE INDEX IF NOT EXISTS mv_recent_violations_date_time_id_desc_idx
+    ON mv_recent_violations (date_time DESC, id DESC);
+CREATE INDEX IF NOT EXISTS mv_recent_violations_search_tsv_idx
+    ON mv_recent_violations USING gin (search_tsv);
+
+SELECT cron.schedule('refresh_mv_recent_violations', '* * * * *',
+    'REFRESH MATERIALIZED VIEW CONCURRENTLY mv_recent_violations');
+
+-- Let PostgREST pick up the new relation
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,14 @@
+-- The `search` parameter of the users, vehicles and violations lists reads
+-- search_tsv (008), so these trigram indexes from 007 serve no query but are
+-- still maintained on every write. The plate_number ones (ILIKE filter) and
+-- scans_camera_id_trgm_idx (scans search) are still used and stay.
+
+DROP INDEX IF EXISTS users_name_trgm_idx;
+DROP INDEX IF EXISTS users_email_trgm_idx;
+
+DROP INDEX IF EXISTS vehicles_make_trgm_idx;
+DROP INDEX IF EXISTS vehicles_model_trgm_idx;
+DROP INDEX IF EXISTS vehicles_owner_name_trgm_idx;
+
+DROP INDEX IF EXISTS violations_location_trgm_idx;
+DROP INDEX IF EXISTS violations_description_trgm_idx;
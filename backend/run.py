@@ -4,20 +4,30 @@ VPR System Backend Runner
 Run this file to start the FastAPI server
 """
 
+import argparse
 import uvicorn
-from app.main import app
 from app.core.config import settings
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start the VPR System Backend")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="worker processes (ignored with --reload)")
+    parser.add_argument("--reload", action=argparse.BooleanOptionalAction, default=settings.DEBUG, help="restart on code changes (default: DEBUG)")
+    args = parser.parse_args()
+    
     print("🚀 Starting VPR System Backend...")
     print(f"📍 Server will run on: http://{settings.HOST}:{settings.PORT}")
     print(f"📚 API Documentation: http://{settings.HOST}:{settings.PORT}/docs")
     print(f"🔧 Debug Mode: {settings.DEBUG}")
     
+    # Reload needs a single process; otherwise run one worker per core
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.DEBUG,
+        reload=args.reload,
+        workers=1 if args.reload else args.workers,
+        loop="uvloop",
+        http="httptools",
+        access_log=settings.DEBUG,
         log_level="info" if not settings.DEBUG else "debug"
-    )
\ No newline at end of file
+    )